@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
+import functools
 import json
+import logging
 import os
 import re
 import sys
@@ -14,6 +16,19 @@ from llm_fs_tools import (DEFAULT_MAX_FILE_BYTES, create_directory_tools,
 # Maximum prompt size to prevent ReDoS and resource exhaustion
 MAX_PROMPT_SIZE = 10_000_000  # 10MB
 
+# Audit logger used by llm-fs-tools for ALLOWED/BLOCKED file access records
+_audit_logger = logging.getLogger("llm_fs_tools.file_audit")
+
+# File/directory reference token: @./ or @../ or @/ followed by valid path
+# characters, including optional :command:arg suffixes for directory operations.
+# Excludes: whitespace, @, and common sentence-ending punctuation (?!,;).
+# One prefix followed by one greedy character class, so a failed match never
+# backtracks and a scan is linear in the prompt length.
+_FILE_REF_RE = re.compile(r"@((?:\.\.?[/\\]|[/\\])[^\s@?!,;]+)")
+
+# Model names: alphanumeric, dots, hyphens, underscores, colons (for tags)
+_MODEL_RE = re.compile(r"^[a-zA-Z0-9._:-]+$")
+
 
 def validate_model_name(model: str) -> str:
     """
@@ -33,7 +48,7 @@ def validate_model_name(model: str) -> str:
 
     # SECURITY: Allow only safe characters for model names
     # Format: alphanumeric, dots, hyphens, underscores, colons (for tags)
-    if not re.match(r"^[a-zA-Z0-9._:-]+$", model):
+    if not _MODEL_RE.match(model):
         raise ValueError(
             f"Invalid model name format: '{model}'. "
             "Only alphanumeric characters, dots, hyphens, underscores, and colons are allowed."
@@ -49,33 +64,15 @@ def validate_model_name(model: str) -> str:
     return model
 
 
-def safe_join_repo(repo_root, path):
-    """Join path to repo_root and prevent path traversal outside repo_root."""
-    # Allow absolute paths but enforce they reside inside repo_root
-    if os.path.isabs(path):
-        target = os.path.abspath(path)
-    else:
-        target = os.path.abspath(os.path.join(repo_root, path))
-
-    # Resolve and normalize both paths
-    try:
-        repo_root_resolved = os.path.realpath(os.path.abspath(repo_root))
-        target_resolved = os.path.realpath(target)
-
-        # On Windows, normalize case for comparison
-        if os.name == "nt":
-            repo_root_resolved = os.path.normcase(repo_root_resolved)
-            target_resolved = os.path.normcase(target_resolved)
-
-        # Use commonpath to verify containment
-        common = os.path.commonpath([repo_root_resolved, target_resolved])
-        if common != repo_root_resolved:
-            raise ValueError(f"path outside repo root: {path}")
-    except (ValueError, OSError) as e:
-        # Propagate path resolution errors
-        raise ValueError(f"path outside repo root: {path}") from e
+@functools.lru_cache(maxsize=32)
+def _get_directory_tools(abs_repo):
+    """
+    Return read-only directory tools for an absolute repo root.
 
-    return target
+    Building the tools resolves the root and sets up its security policy, so
+    the instance is reused for every directory reference under the same root.
+    """
+    return create_directory_tools(abs_repo)
 
 
 def read_file_snippet(path, repo_root=".", max_bytes=DEFAULT_MAX_FILE_BYTES):
@@ -87,8 +84,27 @@ def read_file_snippet(path, repo_root=".", max_bytes=DEFAULT_MAX_FILE_BYTES):
     - File type validation (rejects devices, FIFOs, sockets)
     - Path containment validated AFTER opening (eliminates race condition)
     - Audit logging of all file access attempts
+
+    Audit records are only built when the audit logger would emit them, so
+    a silenced logger skips the per-file message formatting entirely.
     """
-    return read_file_secure(path, repo_root, max_bytes, audit=True)
+    audit = _audit_logger.isEnabledFor(logging.WARNING)
+    return read_file_secure(path, repo_root, max_bytes, audit=audit)
+
+
+def _resolve_target_dir(path, abs_repo):
+    """
+    Resolve a directory reference against an already-absolute repo root.
+
+    Containment is enforced by the directory tools, so this only strips a
+    leading ./ or .\\ and joins once.
+    """
+    if path in (".", "./", ".\\"):
+        return abs_repo
+    # Strip leading ./ or .\ prefix
+    if path.startswith(("./", ".\\")):
+        path = path[2:]
+    return os.path.join(abs_repo, path)
 
 
 def list_directory(path, repo_root="."):
@@ -103,21 +119,10 @@ def list_directory(path, repo_root="."):
         Dict with ok, path, content (formatted listing) or error
     """
     try:
-        # Resolve path relative to repo_root
         abs_repo = os.path.abspath(repo_root)
-        if path in (".", "./", ".\\"):
-            target_dir = abs_repo
-        else:
-            # Strip leading ./ or .\ prefix
-            if path.startswith("./"):
-                clean_path = path[2:]
-            elif path.startswith(".\\"):
-                clean_path = path[2:]
-            else:
-                clean_path = path
-            target_dir = os.path.join(abs_repo, clean_path)
+        target_dir = _resolve_target_dir(path, abs_repo)
 
-        tools = create_directory_tools(abs_repo)
+        tools = _get_directory_tools(abs_repo)
         result = tools.list_directory(target_dir)
 
         if result["success"]:
@@ -162,21 +167,10 @@ def get_directory_tree(path, repo_root=".", max_depth=3):
         Dict with ok, path, content (formatted tree) or error
     """
     try:
-        # Resolve path relative to repo_root
         abs_repo = os.path.abspath(repo_root)
-        if path in (".", "./", ".\\"):
-            target_dir = abs_repo
-        else:
-            # Strip leading ./ or .\ prefix
-            if path.startswith("./"):
-                clean_path = path[2:]
-            elif path.startswith(".\\"):
-                clean_path = path[2:]
-            else:
-                clean_path = path
-            target_dir = os.path.join(abs_repo, clean_path)
+        target_dir = _resolve_target_dir(path, abs_repo)
 
-        tools = create_directory_tools(abs_repo)
+        tools = _get_directory_tools(abs_repo)
         result = tools.get_directory_tree(target_dir, max_depth=max_depth)
 
         if result["success"]:
@@ -241,21 +235,10 @@ def search_directory(path, pattern, repo_root=".", max_results=50):
         Dict with ok, path, content (formatted results) or error
     """
     try:
-        # Resolve path relative to repo_root
         abs_repo = os.path.abspath(repo_root)
-        if path in (".", "./", ".\\"):
-            target_dir = abs_repo
-        else:
-            # Strip leading ./ or .\ prefix
-            if path.startswith("./"):
-                clean_path = path[2:]
-            elif path.startswith(".\\"):
-                clean_path = path[2:]
-            else:
-                clean_path = path
-            target_dir = os.path.join(abs_repo, clean_path)
+        target_dir = _resolve_target_dir(path, abs_repo)
 
-        tools = create_directory_tools(abs_repo)
+        tools = _get_directory_tools(abs_repo)
         result = tools.search_codebase(pattern, target_dir, max_results=max_results)
 
         if result["success"]:
@@ -298,6 +281,7 @@ def expand_file_refs_in_prompt(prompt, repo_root=".", max_bytes=DEFAULT_MAX_FILE
 
     Rules:
     - If reading fails, an error note is inserted instead of silently dropping it.
+    - A reference repeated in the prompt is read once and inlined at each site.
     - Avoid replacing email-like @user tokens by requiring a path-like string.
 
     Raises:
@@ -309,14 +293,16 @@ def expand_file_refs_in_prompt(prompt, repo_root=".", max_bytes=DEFAULT_MAX_FILE
             f"Prompt too large: {len(prompt)} bytes (maximum {MAX_PROMPT_SIZE} bytes)"
         )
 
-    # Pattern matches: @./ or @../ or @/ followed by valid path characters
-    # Now also captures optional :command:arg suffixes for directory operations
-    # Excludes: whitespace, @, and common sentence-ending punctuation (?!,;)
-    pattern = re.compile(r"@((?:\.\.?[/\\]|[/\\])[^\s@?!,;]+)")
+    # Each distinct reference is read once per prompt, even if repeated
+    expansions = {}
 
     def _repl(m):
         full_ref = m.group(1)
+        if full_ref not in expansions:
+            expansions[full_ref] = _expand_ref(full_ref)
+        return expansions[full_ref]
 
+    def _expand_ref(full_ref):
         # Check for directory operation syntax: path/:command or path/:command:arg
         # First, handle :search:pattern (must check before :tree/:list)
         if ":search:" in full_ref:
@@ -360,7 +346,7 @@ def expand_file_refs_in_prompt(prompt, repo_root=".", max_bytes=DEFAULT_MAX_FILE
             f"--- {label} END ---\n\n"
         )
 
-    expanded = pattern.sub(_repl, prompt)
+    expanded = _FILE_REF_RE.sub(_repl, prompt)
     return expanded
 
 
@@ -9,6 +9,38 @@ from datetime import datetime
 from typing import Optional
 
 
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate number of tokens in text.
+
+    Uses simple heuristic: ~4 characters per token.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        int: Estimated token count
+    """
+    return len(text) // 4
+
+
+def is_context_near_limit(
+    context: str, max_context_tokens: int, threshold: float = 0.9
+) -> bool:
+    """
+    Check if context is approaching a token limit.
+
+    Args:
+        context: Context text
+        max_context_tokens: Maximum tokens allowed in context
+        threshold: Percentage of max_context_tokens to consider "near" (default: 0.9 = 90%)
+
+    Returns:
+        bool: True if context is at or above threshold
+    """
+    return estimate_tokens(context) >= max_context_tokens * threshold
+
+
 @dataclass
 class SessionData:
     """
@@ -91,7 +123,7 @@ class SessionData:
         Returns:
             int: Estimated token count
         """
-        return len(self.context) // 4
+        return estimate_tokens(self.context)
 
     def is_context_near_limit(self, threshold: float = 0.9) -> bool:
         """
@@ -103,6 +135,4 @@ class SessionData:
         Returns:
             bool: True if context is at or above threshold
         """
-        current_tokens = self.estimate_tokens()
-        limit = self.max_context_tokens * threshold
-        return current_tokens >= limit
+        return is_context_near_limit(self.context, self.max_context_tokens, threshold)
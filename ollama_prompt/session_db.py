@@ -6,16 +6,22 @@ Supports SQLite (default) and MongoDB (optional) backends.
 
 import os
 import sqlite3
+import threading
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from contextlib import contextmanager
 
 
+@lru_cache(maxsize=1)
 def get_default_db_path() -> Path:
     """
     Get platform-appropriate database path for SQLite.
 
+    The directory is created and its permissions set on the first call;
+    later calls return the cached path without touching the filesystem.
+
     Returns:
         Path: Database file path
 
@@ -46,12 +52,28 @@ def get_default_db_path() -> Path:
     return db_dir / "sessions.db"
 
 
+@lru_cache(maxsize=64)
+def _build_update_sql(columns: Tuple[str, ...]) -> str:
+    """
+    Build the UPDATE statement for a sorted tuple of session columns.
+
+    Callers must validate the columns against
+    SessionDatabase.ALLOWED_UPDATE_COLUMNS before calling.
+    """
+    set_clause = ", ".join(f"{column} = ?" for column in columns)
+    return f"UPDATE sessions SET {set_clause} WHERE session_id = ?"
+
+
 class SessionDatabase:
     """
     Database abstraction layer for session storage.
 
     Handles SQLite operations with proper connection management,
     schema creation, and CRUD operations for sessions.
+
+    Each thread gets its own pooled connection. Connections belonging to
+    threads that have exited are closed when another thread next connects;
+    close() releases all of them.
     """
 
     SCHEMA = """
@@ -74,6 +96,16 @@ class SessionDatabase:
     ON sessions(model_name);
     """
 
+    # Per-connection tuning. journal_mode=WAL is stored in the database file,
+    # so it is set once in _ensure_schema rather than on every connect.
+    CONNECTION_PRAGMAS = """
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -65536;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA busy_timeout = 30000;
+    """
+
     def __init__(self, db_path: Optional[str] = None):
         """
         Initialize database connection.
@@ -97,41 +129,86 @@ class SessionDatabase:
             # Use default path
             self.db_path = str(get_default_db_path())
 
-        # Ensure parent dir exists if necessary (only when using default path)
+        # Ensure parent dir exists if necessary (only when using default path).
+        # get_default_db_path() is cached, so recreate with the same user-only mode
         if not env_path and not db_path:
-            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True, mode=0o700)
 
-        self._conn = None  # Do NOT keep a long-lived connection open by default.
+        # One connection per thread, opened lazily and reused until close().
+        # Keyed by thread ident so connections left by exited threads can be
+        # closed the next time a thread connects.
+        self._local = threading.local()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
 
-        # Initialize schema using the context manager (ensures connection closed)
         with self._get_connection() as conn:
             self._ensure_schema(conn)
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new sqlite3.Connection for the current thread."""
+        # Each connection is only used by the thread that opened it, but
+        # close() may release it from another thread.
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.executescript(self.CONNECTION_PRAGMAS)
+
+        ident = threading.get_ident()
+        alive = {thread.ident for thread in threading.enumerate()}
+        with self._connections_lock:
+            # An entry under our own ident is left over from an exited thread
+            # whose ident was reused
+            stale = [
+                self._connections.pop(key)
+                for key in list(self._connections)
+                if key == ident or key not in alive
+            ]
+            self._connections[ident] = conn
+
+        for old in stale:
+            try:
+                old.close()
+            except sqlite3.Error:
+                pass
+        return conn
+
     @contextmanager
     def _get_connection(self) -> sqlite3.Connection:
         """
-        Provide a short-lived sqlite3.Connection that is always closed on exit.
+        Provide this thread's pooled sqlite3.Connection.
+
+        The connection stays open across calls; close() releases it. Any
+        transaction left open by a failing block is rolled back so it cannot
+        leak into the next call.
         """
-        conn = sqlite3.connect(self.db_path, timeout=30)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
         try:
             yield conn
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                # Be defensive; closing should normally succeed.
-                pass
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
 
     def close(self):
-        """Close database connections (for testing/cleanup)."""
-        # If there is any persistent connection (e.g., from an old pattern), close it.
-        if getattr(self, "_conn", None) is not None:
+        """Close all pooled database connections."""
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections = {}
+            # Fresh thread-local so no thread keeps a handle to a closed connection
+            self._local = threading.local()
+
+        for conn in connections:
             try:
-                self._conn.close()
+                # Refresh planner statistics for tables this connection used
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            try:
+                conn.close()
             except Exception:
+                # Be defensive; closing should normally succeed.
                 pass
-            self._conn = None
 
     def _validate_db_path(self, path: str) -> str:
         """
@@ -170,17 +247,31 @@ class SessionDatabase:
 
     def _ensure_schema(self, conn: sqlite3.Connection):
         """Create database schema if it doesn't exist."""
+        # Restrict permissions before switching to WAL: SQLite creates the
+        # -wal and -shm files with the database file's mode at that moment
+        self._restrict_permissions()
+
+        # Must precede table creation; only takes effect on new database files
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # WAL lets readers proceed during writes and fsyncs only at checkpoints
+        conn.execute("PRAGMA journal_mode = WAL")
         conn.executescript(self.SCHEMA)
         conn.commit()
 
-        # SECURITY: Set restrictive permissions on database file (user-only access)
+    def _restrict_permissions(self):
+        """Limit the database file and its WAL sidecars to the owner."""
+        # SECURITY: Set restrictive permissions on database files (user-only access)
         # On Unix/Linux/Mac: 0o600 (rw-------)
-        if os.name != "nt" and os.path.exists(self.db_path):
-            try:
-                os.chmod(self.db_path, 0o600)
-            except (OSError, PermissionError):
-                # Best effort - may fail if not owner
-                pass
+        if os.name == "nt":
+            return
+
+        for path in (self.db_path, f"{self.db_path}-wal", f"{self.db_path}-shm"):
+            if os.path.exists(path):
+                try:
+                    os.chmod(path, 0o600)
+                except (OSError, PermissionError):
+                    # Best effort - may fail if not owner
+                    pass
 
     def create_session(self, session_data: Dict[str, Any]) -> str:
         """
@@ -199,6 +290,17 @@ class SessionDatabase:
         Returns:
             str: The session_id of the created session
         """
+        # Only read the clock when a timestamp is missing, and use one value
+        # for both so a new session's created_at and last_used agree
+        created_at = session_data.get("created_at")
+        last_used = session_data.get("last_used")
+        if created_at is None or last_used is None:
+            now = datetime.now().isoformat()
+            if created_at is None:
+                created_at = now
+            if last_used is None:
+                last_used = now
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
@@ -212,8 +314,8 @@ class SessionDatabase:
                 (
                     session_data["session_id"],
                     session_data.get("context", ""),
-                    session_data.get("created_at", datetime.now().isoformat()),
-                    session_data.get("last_used", datetime.now().isoformat()),
+                    created_at,
+                    last_used,
                     session_data.get("max_context_tokens", 64000),
                     session_data.get("history_json"),
                     session_data.get("metadata_json"),
@@ -255,14 +357,19 @@ class SessionDatabase:
             return dict(row)
 
     # Whitelist of allowed column names for updates
-    ALLOWED_UPDATE_COLUMNS = {
-        "context",
-        "last_used",
-        "history_json",
-        "metadata_json",
-        "max_context_tokens",
-        "system_prompt",
-    }
+    ALLOWED_UPDATE_COLUMNS = frozenset(
+        {
+            "context",
+            "last_used",
+            "history_json",
+            "metadata_json",
+            "max_context_tokens",
+            "system_prompt",
+        }
+    )
+
+    # Upper bound on free pages reclaimed after each purge
+    PURGE_VACUUM_PAGES = 1000
 
     def update_session(self, session_id: str, updates: Dict[str, Any]):
         """
@@ -279,26 +386,16 @@ class SessionDatabase:
             return
 
         # Validate all column names against whitelist (SECURITY: prevent SQL injection)
-        for key in updates.keys():
-            if key not in self.ALLOWED_UPDATE_COLUMNS:
-                raise ValueError(f"Invalid column name: {key}")
-
-        # Build dynamic UPDATE query
-        set_clauses = []
-        values = []
-
-        for key, value in updates.items():
-            set_clauses.append(f"{key} = ?")
-            values.append(value)
-
+        invalid = updates.keys() - self.ALLOWED_UPDATE_COLUMNS
+        if invalid:
+            raise ValueError(f"Invalid column name: {min(invalid, key=str)}")
+
+        # Same column set -> same SQL text, so sqlite3's statement cache hits
+        columns = tuple(sorted(updates))
+        query = _build_update_sql(columns)
+        values = [updates[column] for column in columns]
         values.append(session_id)  # For WHERE clause
 
-        query = f"""
-            UPDATE sessions
-            SET {', '.join(set_clauses)}
-            WHERE session_id = ?
-        """
-
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, values)
@@ -333,25 +430,51 @@ class SessionDatabase:
         Raises:
             ValueError: If limit is not a positive integer
         """
+        return list(self.iter_all_sessions(limit))
+
+    def iter_all_sessions(
+        self, limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over sessions one row at a time, ordered by last_used descending.
+
+        Unlike list_all_sessions(), rows are fetched as they are consumed, so
+        large context/history_json values are not all held in memory at once.
+
+        Args:
+            limit: Maximum number of sessions to yield (optional)
+
+        Returns:
+            Iterator of session dictionaries
+
+        Raises:
+            ValueError: If limit is not a positive integer (raised immediately)
+        """
         query = """
             SELECT session_id, created_at, last_used,
                    max_context_tokens, model_name, history_json, context
             FROM sessions
             ORDER BY last_used DESC
+            LIMIT ?
         """
 
         # Validate limit parameter (SECURITY: prevent SQL injection)
-        params: tuple[int, ...] = ()
+        # A negative LIMIT means "no limit" to SQLite, so one statement serves both
         if limit is not None:
             if not isinstance(limit, int) or limit <= 0:
                 raise ValueError(f"Invalid limit value: {limit}")
-            query += " LIMIT ?"
-            params = (limit,)
+        else:
+            limit = -1
+
+        return self._iter_rows(query, (limit,))
 
+    def _iter_rows(self, query: str, params: tuple) -> Iterator[Dict[str, Any]]:
+        """Execute a SELECT and yield each row as a dictionary."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
+            for row in cursor:
+                yield dict(row)
 
     def purge_sessions(self, days: int) -> int:
         """
@@ -375,7 +498,20 @@ class SessionDatabase:
                 (cutoff,),
             )
             conn.commit()
-            return cursor.rowcount
+            removed = cursor.rowcount
+
+            if removed:
+                # Hand freed pages back to the filesystem without a full VACUUM.
+                # No-op on databases created before auto_vacuum was enabled.
+                # executescript steps the pragma to completion; execute() would
+                # free only one page. A bulk delete also skews the planner
+                # statistics, so refresh them now rather than waiting for close().
+                conn.executescript(
+                    f"PRAGMA incremental_vacuum({self.PURGE_VACUUM_PAGES});"
+                    "PRAGMA optimize;"
+                )
+
+            return removed
 
     def get_session_count(self) -> int:
         """
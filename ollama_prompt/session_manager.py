@@ -12,12 +12,18 @@ Handles:
 import json
 import os
 import uuid
+from collections import deque
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-from .models import SessionData
+from .models import is_context_near_limit
 from .session_db import SessionDatabase
 
+try:
+    import orjson  # Optional: faster history (de)serialization, see "fast" extra
+except ImportError:
+    orjson = None
+
 # Resource limits to prevent exhaustion attacks
 MAX_SESSIONS = 1000  # Maximum total sessions allowed
 MAX_MESSAGE_SIZE = 1_000_000  # 1MB per message
@@ -26,6 +32,28 @@ MAX_SESSIONS_AUTO_PURGE_DAYS = (
 )
 
 
+def _dumps_history(history: Dict[str, Any]) -> str:
+    """Serialize a history document for the history_json column."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(history).decode("utf-8")
+        except TypeError:
+            # orjson rejects some inputs (e.g. lone surrogates) that json escapes
+            pass
+    return json.dumps(history)
+
+
+def _loads_history(history_json: str) -> Dict[str, Any]:
+    """Parse a history_json column value."""
+    if orjson is not None:
+        try:
+            return orjson.loads(history_json)
+        except orjson.JSONDecodeError:
+            # Fall through so json can handle escapes orjson refuses
+            pass
+    return json.loads(history_json)
+
+
 class SessionManager:
     """
     Manages conversation sessions with persistent context.
@@ -71,16 +99,12 @@ class SessionManager:
             ValueError: If session_id provided but not found in database
         """
         if session_id:
-            # Try to load existing session
+            # Try to load existing session. last_used is written together with
+            # the exchange in update_session(), so loading costs no write.
             session = self.db.get_session(session_id)
             if not session:
                 raise ValueError(f"Session not found: {session_id}")
 
-            # Update last_used timestamp
-            self.db.update_session(
-                session_id, {"last_used": datetime.now().isoformat()}
-            )
-
             return session, False
 
         # Create new session with auto-generated ID
@@ -112,21 +136,24 @@ class SessionManager:
                     file=__import__("sys").stderr,
                 )
 
+        # Build the full row here (same keys as SessionDatabase.get_session)
+        # so the new session can be returned without reading it back
+        now = datetime.now().isoformat()
         session_data = {
             "session_id": new_session_id,
             "context": "",
+            "created_at": now,
+            "last_used": now,
             "max_context_tokens": max_context_tokens,
-            "history_json": json.dumps({"messages": []}),
+            "history_json": _dumps_history({"messages": []}),
+            "metadata_json": None,
             "model_name": model_name,
             "system_prompt": system_prompt,
         }
 
-        created_id = self.db.create_session(session_data)
-        created_session = self.db.get_session(created_id)
-        if created_session is None:
-            raise RuntimeError(f"Session {created_id} was just created but not found in database")
+        self.db.create_session(session_data)
 
-        return created_session, True
+        return session_data, True
 
     def prepare_prompt(self, session: Dict[str, Any], user_prompt: str) -> str:
         """
@@ -145,11 +172,13 @@ class SessionManager:
         Returns:
             Full prompt with context prepended
         """
-        # Load session data model for token estimation
-        session_data = SessionData.from_dict(session)
-
-        # Check if pruning is needed (90% threshold)
-        if session_data.is_context_near_limit(threshold=0.9):
+        # Check if pruning is needed (90% threshold). Works on the session dict
+        # directly so the common short-session path builds no SessionData.
+        if is_context_near_limit(
+            session.get("context") or "",
+            session.get("max_context_tokens", 64000),
+            threshold=0.9,
+        ):
             # Store original state to detect changes
             original_history_json = session.get("history_json")
 
@@ -193,7 +222,7 @@ class SessionManager:
         3. Append user message with timestamp and token estimate
         4. Append assistant message with timestamp and token estimate
         5. Serialize back to history_json
-        6. Rebuild cached plain text in context field
+        6. Extend cached plain text in context field (full rebuild after pruning)
         7. Save to database
 
         Args:
@@ -227,8 +256,11 @@ class SessionManager:
             raise ValueError(f"Session not found: {session_id}")
 
         # Parse existing history
-        history = json.loads(current_session.get("history_json", '{"messages": []}'))
+        history = _loads_history(
+            current_session.get("history_json", '{"messages": []}')
+        )
         messages = history.get("messages", [])
+        had_history = bool(messages)
 
         # Create timestamp
         timestamp = datetime.now().isoformat()
@@ -258,6 +290,8 @@ class SessionManager:
             }
         )
 
+        message_count = len(messages)
+
         # Check if pruning is needed after adding new messages
         max_tokens = current_session.get("max_context_tokens", 64000)
         total_tokens = sum(msg.get("tokens", 0) for msg in messages)
@@ -266,27 +300,37 @@ class SessionManager:
         if total_tokens > (max_tokens * 0.9):
             target_tokens = int(max_tokens * 0.8)  # Prune to 80%
 
-            # Remove oldest messages until under target
-            while total_tokens > target_tokens and len(messages) > 2:
-                removed = messages.pop(0)
+            # Remove oldest messages until under target (deque: O(1) popleft)
+            pending = deque(messages)
+            while total_tokens > target_tokens and len(pending) > 2:
+                removed = pending.popleft()
                 total_tokens -= removed.get("tokens", 0)
 
                 # If there's an assistant message after the user message, remove it too
                 # But only if we'll still have at least 2 messages after removal
                 if (
-                    messages
-                    and messages[0].get("role") == "assistant"
-                    and len(messages) >= 3
+                    pending
+                    and pending[0].get("role") == "assistant"
+                    and len(pending) >= 3
                 ):
-                    removed = messages.pop(0)
+                    removed = pending.popleft()
                     total_tokens -= removed.get("tokens", 0)
+            messages = list(pending)
 
         # Serialize back to JSON
         history["messages"] = messages
-        history_json = json.dumps(history)
-
-        # Rebuild cached plain text from messages
-        cached_context = self._build_context_from_messages(messages)
+        history_json = _dumps_history(history)
+
+        # Cached plain text: when nothing was pruned and the stored context
+        # matches the stored history, only the new exchange needs appending
+        current_context = current_session.get("context") or ""
+        if len(messages) == message_count and bool(current_context) == had_history:
+            exchange = f"User: {user_prompt}\n\nAssistant: {assistant_response}"
+            cached_context = (
+                f"{current_context}\n\n{exchange}" if current_context else exchange
+            )
+        else:
+            cached_context = self._build_context_from_messages(messages)
 
         # Update database
         self.db.update_session(
@@ -324,7 +368,7 @@ class SessionManager:
         target_tokens = int(max_tokens * 0.8)  # Prune to 80%
 
         # Parse history
-        history = json.loads(session.get("history_json", '{"messages": []}'))
+        history = _loads_history(session.get("history_json", '{"messages": []}'))
         messages = history.get("messages", [])
 
         if not messages:
@@ -334,24 +378,26 @@ class SessionManager:
         total_tokens = sum(msg.get("tokens", 0) for msg in messages)
 
         # Prune from the start (oldest messages) if over target
-        while total_tokens > target_tokens and len(messages) > 2:
+        pending = deque(messages)
+        while total_tokens > target_tokens and len(pending) > 2:
             # Remove oldest exchange (user + assistant pair)
-            removed = messages.pop(0)
+            removed = pending.popleft()
             total_tokens -= removed.get("tokens", 0)
 
             # If there's an assistant message after the user message, remove it too
             # But only if we'll still have at least 2 messages after removal
             if (
-                messages
-                and messages[0].get("role") == "assistant"
-                and len(messages) > 2
+                pending
+                and pending[0].get("role") == "assistant"
+                and len(pending) > 2
             ):
-                removed = messages.pop(0)
+                removed = pending.popleft()
                 total_tokens -= removed.get("tokens", 0)
+        messages = list(pending)
 
         # Rebuild history and context
         history["messages"] = messages
-        session["history_json"] = json.dumps(history)
+        session["history_json"] = _dumps_history(history)
         session["context"] = self._build_context_from_messages(messages)
 
         return session
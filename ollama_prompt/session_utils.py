@@ -42,12 +42,11 @@ def list_sessions():
       "total": 3
     }
     """
+    db = None
     try:
         db = SessionDatabase()
-        all_sessions = db.list_all_sessions()
-
         sessions_info = []
-        for session in all_sessions:
+        for session in db.iter_all_sessions():
             # Count messages if history_json exists
             message_count = 0
             if session.get("history_json"):
@@ -77,6 +76,9 @@ def list_sessions():
 
     except Exception as e:
         print(json.dumps({"error": f"Failed to list sessions: {e}"}))
+    finally:
+        if db is not None:
+            db.close()
 
 
 def purge_sessions(days):
@@ -92,6 +94,7 @@ def purge_sessions(days):
       "message": "Removed 5 sessions older than 30 days"
     }
     """
+    db = None
     try:
         db = SessionDatabase()
         removed_count = db.purge_sessions(days)
@@ -105,6 +108,9 @@ def purge_sessions(days):
 
     except Exception as e:
         print(json.dumps({"error": f"Failed to purge sessions: {e}"}))
+    finally:
+        if db is not None:
+            db.close()
 
 
 def show_session_info(session_id):
@@ -132,6 +138,7 @@ def show_session_info(session_id):
       "metadata": {...}
     }
     """
+    db = None
     try:
         db = SessionDatabase()
         session = db.get_session(session_id)
@@ -182,3 +189,6 @@ def show_session_info(session_id):
 
     except Exception as e:
         print(json.dumps({"error": f"Failed to get session info: {e}"}))
+    finally:
+        if db is not None:
+            db.close()
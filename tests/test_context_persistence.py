@@ -42,6 +42,9 @@ def test_auto_create_session():
         assert session['model_name'] == 'test-model', "Model name should be set"
         assert session['max_context_tokens'] == 1000, "Max tokens should be set"
 
+        stored = manager.db.get_session(session['session_id'])
+        assert session == stored, "Returned session should match the stored row"
+
         manager.close()
         print("[OK] Auto-create session works")
 
@@ -81,6 +84,60 @@ def test_load_existing_session():
             os.unlink(db_path)
 
 
+def test_last_used_written_with_exchange():
+    """Test that loading a session is read-only and last_used moves on update."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = f.name
+
+    try:
+        manager = SessionManager(db_path)
+
+        session, _ = manager.get_or_create_session(model_name='test-model')
+        session_id = session['session_id']
+        created_last_used = session['last_used']
+
+        # Loading must not issue a write
+        loaded, _ = manager.get_or_create_session(session_id=session_id)
+        assert manager.db.get_session(session_id)['last_used'] == created_last_used, \
+            "Loading a session should not change last_used"
+
+        manager.update_session(loaded, "Ping", "Pong")
+        stored = manager.db.get_session(session_id)
+        assert stored['last_used'] == loaded['last_used'], \
+            "update_session should persist the exchange timestamp as last_used"
+        assert stored['last_used'] >= created_last_used, "last_used should move forward"
+
+        manager.close()
+        print("[OK] last_used written with exchange")
+
+    finally:
+        if os.path.exists(db_path):
+            os.unlink(db_path)
+
+
+def test_history_serialization_round_trip():
+    """Test history_json helpers with and without orjson installed."""
+    from ollama_prompt import session_manager as sm
+
+    history = {"messages": [
+        {"role": "user", "content": "caf\u00e9 \"quoted\"", "tokens": 2},
+        {"role": "assistant", "content": "lone \ud800 surrogate", "tokens": 3},
+    ]}
+
+    original = sm.orjson
+    try:
+        for backend in (original, None):
+            sm.orjson = backend
+            encoded = sm._dumps_history(history)
+            assert isinstance(encoded, str), "history_json should be stored as text"
+            assert json.loads(encoded) == history, "Round trip should be lossless"
+            assert sm._loads_history(encoded) == history
+    finally:
+        sm.orjson = original
+
+    print("[OK] History serialization round trip works")
+
+
 def test_json_message_storage():
     """Test that messages are stored in JSON format."""
     with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
@@ -208,6 +265,42 @@ def test_prepare_prompt_with_context():
             os.unlink(db_path)
 
 
+def test_prepare_prompt_prunes_near_limit():
+    """Test that prepare_prompt prunes only once context nears the token limit."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = f.name
+
+    try:
+        manager = SessionManager(db_path)
+
+        session, _ = manager.get_or_create_session(model_name='test-model')
+        for i in range(4):
+            manager.update_session(session, f"Question {i}: " + "x" * 40, f"Answer {i}")
+
+        # Well under the default limit: prompt built without touching history
+        stored = manager.db.get_session(session['session_id'])
+        manager.prepare_prompt(stored, "Next question")
+        assert manager.db.get_session(session['session_id'])['history_json'] == stored['history_json']
+
+        # Shrink the limit so the existing context is over 90% of it
+        manager.db.update_session(session['session_id'], {'max_context_tokens': 40})
+        stored = manager.db.get_session(session['session_id'])
+        full_prompt = manager.prepare_prompt(stored, "Next question")
+
+        pruned = manager.db.get_session(session['session_id'])
+        messages = json.loads(pruned['history_json'])['messages']
+        assert len(messages) < 8, "Should have pruned old messages (started with 8)"
+        assert 'Question 0' not in full_prompt, "Oldest exchange should be pruned"
+        assert full_prompt.endswith('User: Next question')
+
+        manager.close()
+        print("[OK] Prepare prompt prunes near limit")
+
+    finally:
+        if os.path.exists(db_path):
+            os.unlink(db_path)
+
+
 def test_context_pruning():
     """Test that context is pruned when approaching token limit."""
     with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
@@ -257,6 +350,36 @@ def test_context_pruning():
             os.unlink(db_path)
 
 
+def test_incremental_context_matches_rebuild():
+    """Test that the appended cached context equals a full rebuild from history."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = f.name
+
+    try:
+        manager = SessionManager(db_path)
+
+        # Limit small enough that later exchanges trigger pruning
+        session, _ = manager.get_or_create_session(
+            model_name='test-model',
+            max_context_tokens=200
+        )
+
+        for i in range(8):
+            manager.update_session(session, f"Question {i}: " + "x" * 40, f"Answer {i}")
+
+            stored = manager.db.get_session(session['session_id'])
+            messages = json.loads(stored['history_json'])['messages']
+            expected = manager._build_context_from_messages(messages)
+            assert stored['context'] == expected, f"Context drifted after exchange {i}"
+
+        manager.close()
+        print("[OK] Incremental context matches full rebuild")
+
+    finally:
+        if os.path.exists(db_path):
+            os.unlink(db_path)
+
+
 def test_multiple_exchanges():
     """Test multiple exchanges maintain conversation history."""
     with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
@@ -315,10 +438,14 @@ def main():
     tests = [
         test_auto_create_session,
         test_load_existing_session,
+        test_last_used_written_with_exchange,
+        test_history_serialization_round_trip,
         test_json_message_storage,
         test_cached_plain_text,
         test_prepare_prompt_with_context,
+        test_prepare_prompt_prunes_near_limit,
         test_context_pruning,
+        test_incremental_context_matches_rebuild,
         test_multiple_exchanges,
     ]
 
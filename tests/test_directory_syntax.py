@@ -12,6 +12,7 @@ Tests cover:
 import os
 import sys
 import tempfile
+import time
 import pytest
 from pathlib import Path
 
@@ -19,6 +20,7 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ollama_prompt.cli import (
+    _get_directory_tools,
     expand_file_refs_in_prompt,
     list_directory,
     get_directory_tree,
@@ -228,6 +230,50 @@ class TestExpandFileRefsWithDirectories:
         assert "FILE: ./config.json" in result
         assert "DIRECTORY: ./src" in result
 
+    def test_repeated_file_ref_read_once(self, tmp_path, monkeypatch):
+        """Test a file referenced twice is read once and inlined twice."""
+        (tmp_path / "notes.md").write_text("shared notes", encoding="utf-8")
+
+        import ollama_prompt.cli as cli
+        calls = []
+        original = cli.read_file_snippet
+
+        def counting_read(path, **kwargs):
+            calls.append(path)
+            return original(path, **kwargs)
+
+        monkeypatch.setattr(cli, "read_file_snippet", counting_read)
+        prompt = "Read @./notes.md then compare with @./notes.md again"
+        result = expand_file_refs_in_prompt(prompt, repo_root=str(tmp_path))
+
+        assert calls == ["./notes.md"]
+        assert result.count("shared notes") == 2
+
+    def test_directory_tools_reused_per_root(self, tmp_path):
+        """Test directory tools are built once per repo root."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+
+        _get_directory_tools.cache_clear()
+        prompt = "Compare @./a/ with @./b/:tree"
+        expand_file_refs_in_prompt(prompt, repo_root=str(tmp_path))
+
+        info = _get_directory_tools.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    @pytest.mark.parametrize("chunk", ["@", "@.", "@..", "@./", "@.@/"])
+    def test_pathological_at_runs_scan_linearly(self, tmp_path, chunk):
+        """Test long runs of near-miss '@' tokens are scanned without backtracking."""
+        prompt = chunk * 200_000
+
+        start = time.perf_counter()
+        result = expand_file_refs_in_prompt(prompt, repo_root=str(tmp_path))
+        elapsed = time.perf_counter() - start
+
+        assert result == prompt
+        assert elapsed < 2.0
+
 
 class TestDirectorySecurityValidation:
     """Test security validation for directory operations."""
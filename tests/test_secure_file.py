@@ -11,6 +11,7 @@ Tests cover:
 - Hardlink detection
 """
 
+import logging
 import os
 import sys
 import stat
@@ -27,6 +28,7 @@ from llm_fs_tools import (
     secure_open_compat as secure_open,
     DEFAULT_MAX_FILE_BYTES
 )
+from ollama_prompt.cli import read_file_snippet
 # Note: check_hardlinks not available in llm-filesystem-tools
 # TestHardlinkDetection class is skipped below
 
@@ -377,5 +379,44 @@ class TestDirectoryRejection:
         assert "directory" in result.get("error", "").lower() or "regular" in result.get("error", "").lower()
 
 
+class TestReadFileSnippetAudit:
+    """Test read_file_snippet only audits when the audit logger is enabled."""
+
+    AUDIT_LOGGER = "llm_fs_tools.file_audit"
+
+    def test_silenced_logger_emits_nothing(self, tmp_path, caplog, monkeypatch):
+        """With the audit logger at ERROR, no records are built and reads still work."""
+        import ollama_prompt.cli as cli
+
+        (tmp_path / "notes.txt").write_text("audit me", encoding="utf-8")
+        caplog.set_level(logging.ERROR, logger=self.AUDIT_LOGGER)
+
+        audit_flags = []
+        original = cli.read_file_secure
+
+        def recording_read(*args, audit=True):
+            audit_flags.append(audit)
+            return original(*args, audit=audit)
+
+        monkeypatch.setattr(cli, "read_file_secure", recording_read)
+        result = read_file_snippet("notes.txt", repo_root=str(tmp_path))
+
+        assert audit_flags == [False]
+        assert result["ok"] is True
+        assert result["content"] == "audit me"
+        assert [r for r in caplog.records if r.name == self.AUDIT_LOGGER] == []
+
+    def test_info_logger_records_allowed_access(self, tmp_path, caplog):
+        """With the audit logger at INFO, the ALLOWED record is still emitted."""
+        (tmp_path / "notes.txt").write_text("audit me", encoding="utf-8")
+        caplog.set_level(logging.INFO, logger=self.AUDIT_LOGGER)
+
+        result = read_file_snippet("notes.txt", repo_root=str(tmp_path))
+
+        assert result["ok"] is True
+        messages = [r.getMessage() for r in caplog.records if r.name == self.AUDIT_LOGGER]
+        assert any(m.startswith("ALLOWED: notes.txt") for m in messages)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
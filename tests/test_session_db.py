@@ -28,6 +28,10 @@ class TestDatabasePath:
         path = get_default_db_path()
         assert path.parent.exists()
 
+    def test_get_default_db_path_is_cached(self):
+        """Test that the default path is resolved once per process."""
+        assert get_default_db_path() is get_default_db_path()
+
     def test_default_path_is_platform_appropriate(self):
         """Test that path is appropriate for current platform."""
         path = get_default_db_path()
@@ -91,6 +95,117 @@ class TestSessionDatabase:
             """)
             assert cursor.fetchone() is not None
 
+    def test_database_uses_wal_journal(self, temp_db):
+        """Test that the database is switched to WAL journaling."""
+        with temp_db._get_connection() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+
+        assert mode.lower() == 'wal'
+        assert synchronous == 1  # NORMAL
+
+    @pytest.mark.skipif(os.name == 'nt', reason="POSIX permissions only")
+    def test_wal_files_are_user_only(self, tmp_path, sample_session):
+        """Test that the database and its WAL sidecar files are created 0600."""
+        import stat
+
+        db_path = str(tmp_path / "sessions.db")
+        db = SessionDatabase(db_path)
+        db.create_session(sample_session)
+
+        try:
+            for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+                assert os.path.exists(path)
+                assert stat.S_IMODE(os.stat(path).st_mode) == 0o600, path
+
+            # Sidecars left with looser modes are tightened on the next open
+            os.chmod(f"{db_path}-wal", 0o644)
+            reopened = SessionDatabase(db_path)
+            reopened.close()
+            assert stat.S_IMODE(os.stat(f"{db_path}-wal").st_mode) == 0o600
+        finally:
+            db.close()
+
+    def test_connection_reused_within_thread(self, temp_db):
+        """Test that a thread reuses its pooled connection."""
+        with temp_db._get_connection() as first:
+            pass
+        with temp_db._get_connection() as second:
+            pass
+
+        assert first is second
+
+    def test_connection_per_thread(self, temp_db):
+        """Test that each thread gets its own connection."""
+        import threading
+
+        with temp_db._get_connection() as main_conn:
+            pass
+
+        seen = []
+
+        def worker():
+            with temp_db._get_connection() as conn:
+                seen.append(conn)
+                conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert len(seen) == 1
+        assert seen[0] is not main_conn
+
+    def test_exited_thread_connections_are_closed(self, temp_db):
+        """Test that connections of finished threads do not accumulate."""
+        import sqlite3
+        import threading
+
+        with temp_db._get_connection():
+            pass
+
+        opened = []
+
+        def worker():
+            with temp_db._get_connection() as conn:
+                opened.append(conn)
+                conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+
+        for _ in range(50):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        # Main thread plus at most the last worker, not yet reaped
+        assert len(temp_db._connections) <= 2
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+
+    def test_close_releases_pooled_connection(self, temp_db, sample_session):
+        """Test that close() drops the pooled connection and later calls reconnect."""
+        with temp_db._get_connection() as before:
+            pass
+
+        temp_db.close()
+        temp_db.create_session(sample_session)
+
+        with temp_db._get_connection() as after:
+            pass
+
+        assert after is not before
+        assert temp_db.get_session(sample_session['session_id']) is not None
+
+    def test_failed_write_is_rolled_back(self, temp_db, sample_session):
+        """Test that an error inside a block does not leave a transaction open."""
+        with pytest.raises(RuntimeError):
+            with temp_db._get_connection() as conn:
+                conn.execute(
+                    "INSERT INTO sessions (session_id) VALUES (?)", ('half-written',)
+                )
+                raise RuntimeError("boom")
+
+        assert temp_db.get_session('half-written') is None
+
     def test_create_session(self, temp_db, sample_session):
         """Test creating a new session."""
         session_id = temp_db.create_session(sample_session)
@@ -102,6 +217,14 @@ class TestSessionDatabase:
         assert retrieved['session_id'] == session_id
         assert retrieved['context'] == sample_session['context']
 
+    def test_create_session_default_timestamps_match(self, temp_db):
+        """Test that a new session's default created_at and last_used agree."""
+        temp_db.create_session({'session_id': 'fresh-session'})
+        retrieved = temp_db.get_session('fresh-session')
+
+        assert retrieved['created_at'] == retrieved['last_used']
+        datetime.fromisoformat(retrieved['created_at'])
+
     def test_get_nonexistent_session(self, temp_db):
         """Test retrieving a session that doesn't exist."""
         result = temp_db.get_session('nonexistent-id')
@@ -131,6 +254,43 @@ class TestSessionDatabase:
         retrieved = temp_db.get_session(session_id)
         assert retrieved['context'] == new_context
 
+    def test_update_session_key_order_independent(self, temp_db, sample_session):
+        """Test that update values are bound to the right columns in any key order."""
+        session_id = temp_db.create_session(sample_session)
+
+        temp_db.update_session(session_id, {'system_prompt': 'sp-1', 'context': 'ctx-1'})
+        temp_db.update_session(session_id, {'context': 'ctx-2', 'system_prompt': 'sp-2'})
+
+        retrieved = temp_db.get_session(session_id)
+        assert retrieved['context'] == 'ctx-2'
+        assert retrieved['system_prompt'] == 'sp-2'
+
+    def test_update_session_rejects_unknown_column(self, temp_db, sample_session):
+        """Test that columns outside the whitelist are rejected."""
+        session_id = temp_db.create_session(sample_session)
+
+        with pytest.raises(ValueError):
+            temp_db.update_session(session_id, {'session_id = session_id; --': 'x'})
+
+    def test_update_session_rejects_mixed_type_keys(self, temp_db, sample_session):
+        """Test that non-string keys still raise ValueError, not TypeError."""
+        session_id = temp_db.create_session(sample_session)
+
+        with pytest.raises(ValueError, match="Invalid column name"):
+            temp_db.update_session(session_id, {1: 'x', 'bad': 'y'})
+
+    def test_update_session_last_used_only(self, temp_db, sample_session):
+        """Test that a last_used-only update touches nothing else."""
+        session_id = temp_db.create_session(sample_session)
+        before = temp_db.get_session(session_id)
+
+        temp_db.update_session(session_id, {'last_used': '2030-01-01T00:00:00'})
+
+        after = temp_db.get_session(session_id)
+        assert after['last_used'] == '2030-01-01T00:00:00'
+        assert {k: v for k, v in after.items() if k != 'last_used'} == \
+            {k: v for k, v in before.items() if k != 'last_used'}
+
     def test_update_session_with_no_changes(self, temp_db, sample_session):
         """Test update with empty dict does nothing."""
         session_id = temp_db.create_session(sample_session)
@@ -190,6 +350,25 @@ class TestSessionDatabase:
         limited = temp_db.list_all_sessions(limit=3)
         assert len(limited) == 3
 
+    def test_iter_all_sessions(self, temp_db):
+        """Test iterating sessions lazily in last_used order."""
+        for i in range(3):
+            temp_db.create_session({
+                'session_id': f'session-{i}',
+                'last_used': f'2025-01-0{i + 1}T00:00:00'
+            })
+
+        iterator = temp_db.iter_all_sessions()
+        assert not isinstance(iterator, list)
+
+        session_ids = [s['session_id'] for s in iterator]
+        assert session_ids == ['session-2', 'session-1', 'session-0']
+
+    def test_iter_all_sessions_validates_limit_eagerly(self, temp_db):
+        """Test that an invalid limit is rejected before iteration starts."""
+        with pytest.raises(ValueError):
+            temp_db.iter_all_sessions(limit=0)
+
     def test_purge_old_sessions(self, temp_db):
         """Test purging sessions older than specified days."""
         # Create sessions with different timestamps
@@ -216,6 +395,24 @@ class TestSessionDatabase:
         assert temp_db.get_session('old-session') is None
         assert temp_db.get_session('recent-session') is not None
 
+    def test_purge_reclaims_free_pages(self, temp_db):
+        """Test that purging releases freed pages via incremental vacuum."""
+        with temp_db._get_connection() as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+
+        old_timestamp = (datetime.now() - timedelta(days=35)).isoformat()
+        for i in range(20):
+            temp_db.create_session({
+                'session_id': f'old-{i}',
+                'context': 'x' * 20000,
+                'last_used': old_timestamp
+            })
+
+        assert temp_db.purge_sessions(30) == 20
+
+        with temp_db._get_connection() as conn:
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
     def test_get_session_count(self, temp_db):
         """Test getting total session count."""
         assert temp_db.get_session_count() == 0